@@ -62,6 +62,16 @@ class Renderer(renderer.Renderer):
           ctx (context.DrawingContext): A context with shapes to draw
         """
         image = np.zeros((self.height, self.width, 3), np.uint8)
+        self._rasterize(ctx, image)
+        self._display_frame(image)
+
+    def _rasterize(self, ctx, image):
+        """Draw all shapes in the context into an existing image, in place.
+
+        Args:
+          ctx (context.DrawingContext): A context with shapes to draw
+          image (numpy.ndarray): A (height, width, 3) uint8 BGR image
+        """
         for shape in ctx.shapes:
             if isinstance(shape, context.Rectangle):
                 x = int(shape.width / 2)
@@ -77,13 +87,13 @@ class Renderer(renderer.Renderer):
                              color=shape.color)
             elif isinstance(shape, context.Circle):
                 center = (int(shape.center.x), int(shape.center.y))
-                image = cv2.circle(image, center, int(shape.radius),
-                                   color=shape.color, thickness=-1)
+                cv2.circle(image, center, int(shape.radius),
+                           color=shape.color, thickness=-1)
             elif isinstance(shape, context.Text):
                 center = (int(shape.center.x), int(shape.center.y))
-                image = cv2.putText(image, shape.content, center,
-                                    cv2.FONT_HERSHEY_SIMPLEX, shape.size,
-                                    shape.color, 3, cv2.LINE_AA)
+                cv2.putText(image, shape.content, center,
+                            cv2.FONT_HERSHEY_SIMPLEX, shape.size,
+                            shape.color, 3, cv2.LINE_AA)
             elif isinstance(shape, context.Image):
                 file_image = cv2.imread(shape.filepath, cv2.IMREAD_UNCHANGED)
                 file_image = cv2.resize(file_image, (shape.width, shape.height))
@@ -104,9 +114,7 @@ class Renderer(renderer.Renderer):
                                     alpha_s * file_image[:, :, c] +
                                     alpha_l * image[y1:y2, x1:x2, c])
                     except ValueError:
-                        image = image_save
-
-        self._display_frame(image)
+                        image[:] = image_save
 
     def _display_frame(self, image):
         cv2.imshow(Renderer.WINDOW_TITLE, image)
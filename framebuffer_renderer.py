@@ -0,0 +1,298 @@
+import atexit
+import os
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import cv2_renderer
+
+
+# Header layout, as uint64 fields at the start of the shared memory block.
+HEADER_FIELDS = ("width", "height", "channels", "sequence", "front", "ready",
+                 "owner")
+WIDTH, HEIGHT, NUM_CHANNELS, SEQUENCE, FRONT, READY, OWNER = range(
+    len(HEADER_FIELDS))
+HEADER_SIZE = 64
+CHANNELS = 3
+DEFAULT_NAME = "tinyland_framebuffer"
+
+
+def _frame_size(width, height):
+    return width * height * CHANNELS
+
+
+def _attach(name):
+    """Open an existing block without handing it to our resource tracker.
+
+    A tracked block would be unlinked when this process exits, pulling it out
+    from under the process that owns it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    # Older versions always register on attach. Unregistering afterwards isn't
+    # safe: the tracker is keyed by name only and may be shared with the owner
+    # (same process, or a forked multiprocessing child), so skip registering.
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+def _unlink(shm):
+    """Unlink a block opened with `_attach`."""
+    if sys.version_info < (3, 13):
+        # unlink() unregisters the name, so register it first to balance out
+        resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
+
+
+def _pid_alive(pid):
+    if os.name != "posix":
+        # os.kill would terminate the process on Windows. A named block only
+        # exists there while something holds it open, so assume it's in use.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _release(shm):
+    try:
+        shm.close()
+    except BufferError:
+        # Frames handed out earlier are still alive; the mapping goes away
+        # once they're garbage collected.
+        pass
+
+
+def _map_header(buf):
+    return np.ndarray((len(HEADER_FIELDS),), dtype=np.uint64, buffer=buf)
+
+
+def _map_frames(buf, width, height):
+    return [np.ndarray((height, width, CHANNELS), dtype=np.uint8, buffer=buf,
+                       offset=HEADER_SIZE + i * _frame_size(width, height))
+            for i in range(2)]
+
+
+class Renderer(cv2_renderer.Renderer):
+    """Render into a double-buffered framebuffer instead of a window.
+
+    Shapes are rasterized straight into the back buffer, which is then flipped
+    to the front. By default both buffers live in a named shared memory block
+    so another process (a compositor, a recorder...) can read finished frames
+    without copying them, see `Reader`. With `offscreen=True` the buffers are
+    plain NumPy arrays, which is handy for tests and benchmarks.
+
+    Either way, `render` returns the front buffer. It stays untouched until
+    the render after next, so copy it if you need to keep it longer.
+
+    Args:
+      width (int): width of the framebuffer
+      height (int): height of the framebuffer
+      name (str): name of the shared memory block
+      offscreen (bool): keep the framebuffer in process memory only
+    """
+
+    def __init__(self, width, height, name=DEFAULT_NAME, offscreen=False):
+        super().__init__(width, height)
+        self.name = name
+        self.offscreen = offscreen
+        self._shm = None
+        self.header = None
+        self.frames = None
+        if offscreen:
+            # Ready to render without setup(), for tests and benchmarks
+            self.header = np.zeros((len(HEADER_FIELDS),), dtype=np.uint64)
+            self.frames = [np.zeros((height, width, CHANNELS), np.uint8)
+                           for _ in range(2)]
+            self._init_header()
+
+    def setup(self):
+        """Allocate the shared memory header and both frame buffers."""
+        if self.offscreen:
+            return
+        size = HEADER_SIZE + 2 * _frame_size(self.width, self.height)
+        try:
+            self._shm = shared_memory.SharedMemory(self.name, create=True,
+                                                   size=size)
+        except FileExistsError:
+            self._reclaim_stale()
+            self._shm = shared_memory.SharedMemory(self.name, create=True,
+                                                   size=size)
+        self.header = _map_header(self._shm.buf)
+        self.frames = _map_frames(self._shm.buf, self.width, self.height)
+        atexit.register(self.close)
+        print(f"Rendering to shared memory framebuffer '{self.name}'.")
+        self._init_header()
+
+    def _init_header(self):
+        self.header[:] = 0
+        self.header[OWNER] = os.getpid()
+        self.header[WIDTH] = self.width
+        self.header[HEIGHT] = self.height
+        # Written last: Readers treat a block without it as uninitialized
+        self.header[NUM_CHANNELS] = CHANNELS
+
+    def _reclaim_stale(self):
+        """Remove a block left behind by a renderer that didn't shut down.
+
+        Raises:
+          FileExistsError: if the block's owner is still running, or the block
+            doesn't look like one of ours.
+        """
+        stale = _attach(self.name)
+        header = None
+        if stale.size >= HEADER_SIZE:
+            header = _map_header(stale.buf)
+            owner = int(header[OWNER])
+        if header is None or owner == 0 or _pid_alive(owner):
+            del header
+            _release(stale)
+            raise FileExistsError(
+                f"Shared memory framebuffer '{self.name}' is in use by another "
+                f"renderer. Stop it, or pick a different name.")
+        # Let Readers still attached to the old block know it's gone
+        header[READY] = 0
+        del header
+        _release(stale)
+        _unlink(stale)
+
+    def toggle_fullscreen(self):
+        pass
+
+    def close(self):
+        """Mark the framebuffer as no longer ready and release it."""
+        if self.header is None:
+            return
+        self.header[READY] = 0
+        self.header = None
+        self.frames = None
+        if self._shm is not None:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            _release(self._shm)
+            self._shm = None
+
+    @property
+    def sequence(self):
+        """Number of frames published so far."""
+        return int(self.header[SEQUENCE])
+
+    @property
+    def front(self):
+        """The most recently finished frame."""
+        return self.frames[int(self.header[FRONT])]
+
+    def render(self, ctx):
+        """Rasterize the draw context into the back buffer and flip it.
+
+        Args:
+          ctx (context.DrawingContext): A context with shapes to draw
+        Returns:
+          numpy.ndarray: the front buffer, holding the new frame
+        """
+        back = self._back_buffer()
+        back.fill(0)
+        self._rasterize(ctx, back)
+        self._flip()
+        return self.front
+
+    def _display_frame(self, image):
+        back = self._back_buffer()
+        back[:] = image
+        self._flip()
+
+    def _back_buffer(self):
+        return self.frames[1 - int(self.header[FRONT])]
+
+    def _flip(self):
+        # These are plain stores with no memory barrier, so another process
+        # may see them before all of the frame's pixels. See `Reader`.
+        self.header[FRONT] = 1 - int(self.header[FRONT])
+        self.header[SEQUENCE] += 1
+        self.header[READY] = 1
+
+
+class Reader:
+    """Read frames published by a shared memory `Renderer` in another process.
+
+    Frames are views into shared memory, not copies. The renderer starts
+    drawing over a frame as soon as it publishes the next one, so check
+    `valid` once done with a frame and drop it if the check fails:
+
+        seq, frame = reader.latest()
+        recorder.write(frame)
+        if not reader.valid(seq):
+            ...  # frame was torn, discard it
+
+    `valid` only tells you the renderer hasn't moved on to a later frame.
+    Header and pixel writes aren't fenced, so on weakly ordered CPUs (ARM,
+    Apple Silicon) a freshly published frame may briefly show pixels from
+    before it was finished. Nothing here detects that.
+
+    Args:
+      name (str): name of the shared memory block
+    Raises:
+      ValueError: if the block's header is uninitialized or doesn't match
+        this module's frame layout.
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        self._shm = _attach(name)
+        header = (_map_header(self._shm.buf)
+                  if self._shm.size >= HEADER_SIZE else None)
+        if header is None or int(header[NUM_CHANNELS]) != CHANNELS:
+            del header
+            _release(self._shm)
+            raise ValueError(f"Shared memory block '{name}' isn't an "
+                             f"initialized framebuffer.")
+        width, height = int(header[WIDTH]), int(header[HEIGHT])
+        if (width == 0 or height == 0 or
+                self._shm.size < HEADER_SIZE + 2 * _frame_size(width, height)):
+            del header
+            _release(self._shm)
+            raise ValueError(f"Shared memory framebuffer '{name}' has a bad "
+                             f"size: {width}x{height}.")
+        self.header = header
+        self.width, self.height = width, height
+        self.frames = _map_frames(self._shm.buf, self.width, self.height)
+
+    @property
+    def ready(self):
+        """Whether the renderer has published a frame and is still running."""
+        return bool(self.header[READY])
+
+    @property
+    def sequence(self):
+        return int(self.header[SEQUENCE])
+
+    def latest(self):
+        """Get the most recently finished frame.
+
+        Returns:
+          (int, numpy.ndarray): the frame's sequence number and the frame, or
+          (sequence, None) if no frame is ready.
+        """
+        seq = self.sequence
+        if not self.ready:
+            return seq, None
+        return seq, self.frames[int(self.header[FRONT])]
+
+    def valid(self, sequence):
+        """Whether the frame returned along with `sequence` is still intact."""
+        return self.sequence == sequence
+
+    def close(self):
+        self.header = None
+        self.frames = None
+        _release(self._shm)